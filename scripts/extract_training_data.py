@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# ============================================================================
+# TRAINING DATA EXTRACTOR
+# Builds classifier training sets from stored memory files.
+#
+# Memories are persisted by fsdb as markdown + YAML frontmatter under
+# ~/.local/share/memory/{project-id}/memories/*.md (see src/core/store.ts).
+# The curator's handcrafted trigger_phrases and semantic_tags become training
+# text, labelled by context_type / domain / temporal_class - the same signals
+# the retrieval algorithm matches on (src/core/retrieval.ts).
+#
+# Usage: python3 scripts/extract_training_data.py
+# ============================================================================
+
+import json
+import mmap
+import os
+import pickle
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import yaml
+
+# libyaml-backed loader: ~5-15x faster than the pure-Python SafeLoader on
+# frontmatter-sized documents. Falls back when PyYAML was built without
+# the C extension.
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# orjson encodes in C (5-10x stdlib json); optional, stdlib fallback below
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyarrow lets us ship Parquet, which HF datasets ingests zero-copy;
+# optional, JSONL fallback below
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# numpy pushes the label histogram into C; optional, Counter fallback below
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MEMORY_BASE = Path.home() / ".local" / "share" / "memory"
+OUTPUT_DIR = Path(__file__).parent / "training-data"
+
+# On-disk parse cache: this extractor is re-run iteratively during
+# classifier training, and unchanged files shouldn't be re-parsed
+CACHE_FILE = Path.home() / ".cache" / "memory-ts" / "parse.pkl"
+
+# Which frontmatter label fields get their own classifier dataset
+LABEL_FIELDS = ("context_type", "domain", "temporal_class")
+
+# Single-pass C loop for kebab-case -> words; ~2x str.replace on short tags
+_DASH_TABLE = str.maketrans({"-": " "})
+
+# Above this size, map the file instead of reading line-by-line: the
+# frontmatter span is sliced straight out of the page cache and the body
+# pages are never faulted into the Python heap
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _read_frontmatter_stream(f):
+    """Read lines until the closing '---'; I/O proportional to frontmatter."""
+    if f.readline().rstrip() != b"---":
+        return None
+
+    lines = []
+    for line in f:
+        if line.rstrip() == b"---":
+            break
+        lines.append(line)
+    else:
+        # Never saw the closing delimiter
+        return None
+
+    return b"".join(lines)
+
+
+def _read_frontmatter_mmap(f):
+    """Slice the frontmatter span out of a memory map; body stays untouched."""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:4] != b"---\n":
+            return None
+
+        end = mm.find(b"\n---", 3)
+        if end < 0:
+            return None
+
+        return mm[4:end]
+
+
+def parse_memory_file(file_path):
+    """Parse a memory file into the fields the training pipeline uses.
+
+    Only the frontmatter region is ever read: small files stream line-by-
+    line until the closing delimiter, large ones are mmap'd and sliced so
+    the body - which can dwarf the frontmatter and is never needed here -
+    stays out of the Python heap entirely.
+
+    Returns a (trigger_phrases, semantic_tags, context_type, domain,
+    temporal_class) tuple - the full frontmatter has dozens of keys, but
+    create_training_data only reads these five, and the slim tuple keeps
+    pickled payloads small when parsing is fanned out to worker processes.
+
+    Returns None for files without valid frontmatter (e.g. the personal
+    primer, or hand-edited files with broken YAML).
+
+    Takes a plain str path: constructing a Path per file allocates several
+    intermediate strings, and nothing here needs more than open().
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            fm_bytes = _read_frontmatter_mmap(f)
+        else:
+            fm_bytes = _read_frontmatter_stream(f)
+
+    if fm_bytes is None:
+        return None
+
+    # Cheap pre-check on the raw span: memories without trigger_phrases or
+    # semantic_tags yield no training text, so skip the YAML parse entirely
+    if b"trigger_phrases" not in fm_bytes and b"semantic_tags" not in fm_bytes:
+        return None
+
+    try:
+        frontmatter = yaml.load(fm_bytes, Loader=_Loader)
+    except yaml.YAMLError:
+        return None
+
+    if not isinstance(frontmatter, dict):
+        return None
+
+    return (
+        frontmatter.get("trigger_phrases") or (),
+        frontmatter.get("semantic_tags") or (),
+        frontmatter.get("context_type") or "",
+        frontmatter.get("domain") or "",
+        frontmatter.get("temporal_class") or "",
+    )
+
+
+def find_memory_files():
+    """Collect (path, mtime_ns, size) for every memory file.
+
+    Uses os.scandir so is_dir/is_file come from the cached DirEntry data
+    instead of a stat() syscall per path; the DirEntry stat feeds the
+    parse-cache key.
+    """
+    entries = []
+
+    try:
+        base_it = os.scandir(MEMORY_BASE)
+    except FileNotFoundError:
+        return entries
+
+    with base_it:
+        for project_entry in base_it:
+            if not project_entry.is_dir(follow_symlinks=False):
+                continue
+
+            memories_dir = os.path.join(project_entry.path, "memories")
+            try:
+                mem_it = os.scandir(memories_dir)
+            except FileNotFoundError:
+                continue
+
+            with mem_it:
+                for entry in mem_it:
+                    if not entry.name.endswith(".md"):
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                    entries.append((entry.path, st.st_mtime_ns, st.st_size))
+
+    return entries
+
+
+def _load_cache():
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+
+
+def _save_cache(cache):
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, "wb") as f:
+        pickle.dump(cache, f)
+
+
+# Below this many files the pool spawn costs more than the parse itself
+_PARALLEL_THRESHOLD = 256
+
+
+def _parse_paths(paths):
+    """Parse a batch of paths, fanning out to worker processes.
+
+    YAML parsing is CPU-bound and embarrassingly parallel; chunksize keeps
+    IPC pickling amortized across batches of paths.
+    """
+    if len(paths) < _PARALLEL_THRESHOLD:
+        return list(map(parse_memory_file, paths))
+
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(parse_memory_file, paths, chunksize=64))
+
+
+def extract_all_memories():
+    """Parse all memory files, skipping those unchanged since the last run.
+
+    The cache keys on (path, mtime_ns, size), so re-runs during classifier
+    training cost a stat per file instead of a parse. Entries for deleted
+    or changed files are dropped as a side effect of rebuilding from the
+    current file list.
+    """
+    old_cache = _load_cache()
+
+    memories = []
+    misses = []
+    cache = {}
+    for key in find_memory_files():
+        if key in old_cache:
+            parsed = cache[key] = old_cache[key]
+            if parsed:
+                memories.append(parsed)
+        else:
+            misses.append(key)
+
+    if misses:
+        for key, parsed in zip(misses, _parse_paths([path for path, _, _ in misses])):
+            cache[key] = parsed
+            if parsed:
+                memories.append(parsed)
+
+    if cache != old_cache:
+        _save_cache(cache)
+
+    return memories
+
+
+def create_training_data(memories):
+    """Turn parsed memories into (text, label) examples per classifier."""
+    # Sets of (text, label) tuples: the same trigger phrase repeated across
+    # memories would otherwise emit duplicate training rows
+    datasets = {field: set() for field in LABEL_FIELDS}
+    raw_labels = {field: [] for field in LABEL_FIELDS}
+
+    # Bind the per-field add/extend methods once; resolving
+    # datasets[field].add inside the hot loop costs a dict lookup plus
+    # method creation per example
+    outputs = [(datasets[field].add, raw_labels[field].extend) for field in LABEL_FIELDS]
+
+    for trigger_phrases, semantic_tags, context_type, domain, temporal_class in memories:
+        # Trigger phrases as-is; tags are kebab-case, so normalize to words
+        texts = list(trigger_phrases)
+        texts += [tag.translate(_DASH_TABLE) for tag in semantic_tags]
+
+        labels = (context_type, domain, temporal_class)
+        for (add, extend_raw), label in zip(outputs, labels):
+            if not label:
+                continue
+            for text in texts:
+                add((text, label))
+            extend_raw([label] * len(texts))
+
+    # Histogram the raw occurrences once at the end instead of bumping a
+    # Counter per example inside the hot loop
+    stats = {f"{field}_counts": _histogram(raw_labels[field]) for field in LABEL_FIELDS}
+    return datasets, stats
+
+
+def _histogram(labels):
+    """Count raw label occurrences, in C via numpy when available."""
+    if np is not None and labels:
+        values, counts = np.unique(np.array(labels, dtype=object), return_counts=True)
+        return Counter(dict(zip(values.tolist(), counts.tolist())))
+    return Counter(labels)
+
+
+def _dump_jsonl(data, path):
+    """Encode all lines into one buffer and write it in a single call."""
+    if orjson is not None:
+        buf = b"\n".join(orjson.dumps(item) for item in data)
+    else:
+        dumps = json.dumps
+        buf = "\n".join(dumps(item) for item in data).encode()
+
+    with open(path, "wb") as f:
+        f.write(buf + b"\n" if buf else b"")
+
+
+def save_datasets(datasets):
+    """Write each dataset for training (Parquet or JSONL) + JSON for review."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    for name, pairs in datasets.items():
+        ordered = sorted(pairs)  # stable diffs between runs
+
+        # Columnar layout: two flat lists instead of one dict per example.
+        # HF datasets consumes columns directly, and Parquet feeds it
+        # zero-copy where pyarrow is available
+        columns = {
+            "text": [text for text, _ in ordered],
+            "label": [label for _, label in ordered],
+        }
+
+        if pa is not None:
+            train_file = OUTPUT_DIR / f"{name}_train.parquet"
+            pq.write_table(pa.table(columns), train_file)
+        else:
+            train_file = OUTPUT_DIR / f"{name}_train.jsonl"
+            _dump_jsonl(({"text": text, "label": label} for text, label in ordered), train_file)
+
+        # stdlib json's indent machinery is pure Python and dominates this
+        # stage on large datasets; orjson indents in C, and without orjson
+        # a compact dump beats pretty-printing (pipe through jq to inspect)
+        json_file = OUTPUT_DIR / f"{name}_train.json"
+        if orjson is not None:
+            json_file.write_bytes(orjson.dumps(columns, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_file, "w") as f:
+                json.dump(columns, f)
+
+        print(f"  {name}: {len(ordered)} examples -> {train_file.name}")
+
+
+def main():
+    print(f"Scanning {MEMORY_BASE} ...")
+    memories = extract_all_memories()
+    print(f"Parsed {len(memories)} memories")
+
+    datasets, stats = create_training_data(memories)
+
+    print("\nLabel distribution:")
+    for field in LABEL_FIELDS:
+        counts = stats[f"{field}_counts"]
+        print(f"  {field}:")
+        for label, count in counts.most_common():
+            print(f"    {label}: {count}")
+
+    print("\nWriting datasets:")
+    save_datasets(datasets)
+
+
+if __name__ == "__main__":
+    main()
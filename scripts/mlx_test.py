@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# ============================================================================
+# MLX CLASSIFIER BENCHMARK (Apple Silicon)
+# Times the local-LLM fallback classifier: a small instruct model labelling
+# user messages with the same retrieval metadata the MiniLM classifier
+# predicts (context_type / domain, see scripts/minilm_test.py).
+#
+# The system prompt is identical for every message, so its KV cache is
+# computed once and cloned per message - each generate call then processes
+# only the ~20 message tokens instead of rebuilding the full prompt cache.
+#
+# Usage: python3 scripts/mlx_test.py [model_name]
+# ============================================================================
+
+import copy
+import sys
+import time
+
+import mlx.core as mx
+from mlx_lm import load
+from mlx_lm.models.cache import make_prompt_cache
+from mlx_lm.utils import generate_step
+
+DEFAULT_MODEL = "mlx-community/Qwen2.5-0.5B-Instruct-4bit"
+
+SYSTEM_PROMPT = """You classify user messages for a memory retrieval system.
+Respond with a JSON object containing exactly these fields:
+  "context_type": one of breakthrough, decision, personal, technical,
+                  preference, architecture, workflow, philosophy
+  "domain": one or two lowercase words naming the area the message concerns
+  "problem": true when the user is reporting something broken, else false
+Output the JSON object and nothing else."""
+
+TEST_MESSAGES = [
+    "how does the activation signal scoring work in retrieval?",
+    "let's switch the store to batched writes, the fsync per memory is killing us",
+    "I prefer short answers without all the preamble",
+    "that bug we fixed yesterday in the curator is back",
+    "what should the architecture look like for multi-project sessions?",
+    "remind me what we decided about the embedding model",
+    "my daughter's birthday is next week so I'll be offline",
+    "the onnx export finally matches the pytorch logits, huge relief",
+]
+
+MAX_TOKENS = 150
+
+
+def build_prefix_cache(model, tokenizer):
+    """Run the shared system prompt through the model once.
+
+    The resulting KV cache is cloned for every message, so per-message
+    prompt processing shrinks to just the message tokens.
+    """
+    tokens = mx.array(tokenizer.encode(SYSTEM_PROMPT))
+    cache = make_prompt_cache(model)
+    model(tokens[None], cache=cache)
+    # Force evaluation here so lazy compute doesn't leak into the timers
+    mx.eval([c.state for c in cache])
+    return cache
+
+
+def classify(model, tokenizer, prefix_cache, message):
+    """Generate a classification for one message on a cloned prefix cache."""
+    cache = copy.deepcopy(prefix_cache)
+    prompt = f'\n\nUser message: "{message}"\n\nJSON output:'
+    tokens = mx.array(tokenizer.encode(prompt, add_special_tokens=False))
+
+    output_tokens = []
+    for token, _ in generate_step(tokens, model, prompt_cache=cache):
+        if token == tokenizer.eos_token_id:
+            break
+        output_tokens.append(token)
+        if len(output_tokens) >= MAX_TOKENS:
+            break
+
+    return tokenizer.decode(output_tokens).strip()
+
+
+def test_model(model_name):
+    print(f"Loading {model_name}...")
+    model, tokenizer = load(model_name)
+
+    start = time.perf_counter()
+    prefix_cache = build_prefix_cache(model, tokenizer)
+    print(f"System prompt cached in {(time.perf_counter() - start) * 1000:.0f}ms "
+          f"({len(tokenizer.encode(SYSTEM_PROMPT))} tokens, paid once)")
+
+    # Warmup generation so lazy kernel compilation stays out of the average
+    classify(model, tokenizer, prefix_cache, TEST_MESSAGES[0])
+
+    total = 0.0
+    for message in TEST_MESSAGES:
+        start = time.perf_counter()
+        result = classify(model, tokenizer, prefix_cache, message)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+
+        print(f"\n  {message[:60]}")
+        print(f"  -> {result[:100]} ({elapsed * 1000:.0f}ms)")
+
+    print(f"\nAverage: {total * 1000 / len(TEST_MESSAGES):.0f}ms/message "
+          f"(prompt processing limited to message tokens)")
+
+
+def main():
+    model_name = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL
+    test_model(model_name)
+
+
+if __name__ == "__main__":
+    main()